@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+聚餐地点推荐 - Numba 编译的计算内核
+
+供 centroid_calculator 在批量距离计算、大批量餐厅打分时延迟加载，
+numba 不可用时由调用方回退到纯 Python 实现
+"""
+
+import math
+
+from numba import njit, prange
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def haversine_pairs(lat1, lon1, lat2, lon2, out):
+    """
+    逐对计算 (lat1[i], lon1[i]) 与 (lat2[i], lon2[i]) 的直线距离（Haversine公式）
+
+    参数:
+        lat1, lon1: 第一组点的纬度、经度数组（float64）
+        lat2, lon2: 第二组点的纬度、经度数组（float64，与第一组等长）
+        out: 输出数组，写入距离（单位：km）
+    """
+    R = 6371.0  # 地球半径（km）
+    deg2rad = math.pi / 180.0
+
+    for i in prange(lat1.size):
+        lat1_rad = lat1[i] * deg2rad
+        lat2_rad = lat2[i] * deg2rad
+        delta_lat = (lat2[i] - lat1[i]) * deg2rad
+        delta_lon = (lon2[i] - lon1[i]) * deg2rad
+
+        a = math.sin(delta_lat * 0.5) ** 2 + \
+            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon * 0.5) ** 2
+        out[i] = 2.0 * R * math.asin(math.sqrt(a))
+
+
+@njit(cache=True, parallel=True)
+def score_restaurants(ratings, review_counts, distances_km, ref_reviews, ref_distance, out):
+    """
+    批量计算餐厅综合分数，公式与 RestaurantRanker.calculate_restaurant_score 一致
+
+    不启用 fastmath：向量化主体与尾部循环的舍入必须一致，
+    否则同分餐厅会得到不同分数，排序不再稳定
+
+    参数:
+        ratings: 评分数组 (0-5)
+        review_counts: 评论数数组
+        distances_km: 距离中心地点数组 (km)
+        ref_reviews: 评论数参考值
+        ref_distance: 距离参考值 (km)
+        out: 输出数组，写入综合分数 (0-100)
+    """
+    near_k = 0.3 / ref_distance
+
+    for i in prange(ratings.size):
+        rating_normalized = ratings[i] / 5.0
+
+        if ref_reviews == 0:
+            review_normalized = 0.5
+        else:
+            review_normalized = review_counts[i] / ref_reviews
+
+        distance_km = distances_km[i]
+        if distance_km <= ref_distance:
+            distance_normalized = 1.0 - distance_km * near_k
+        else:
+            distance_normalized = max(0.0, 0.7 - (distance_km - ref_distance) * 0.1)
+
+        out[i] = (
+            rating_normalized * 0.7 +
+            review_normalized * 0.2 +
+            distance_normalized * 0.1
+        ) * 100
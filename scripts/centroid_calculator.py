@@ -6,22 +6,94 @@
 以及与高德地图API的集成
 """
 
+import heapq
+import importlib.util
 import math
+import os
+import sys
+import warnings
 import json
-from typing import List, Tuple, Dict, Optional
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, List, Tuple, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时回退到纯 Python 实现
+    np = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec 为可选依赖，缺失时按普通字典解析API响应
+    msgspec = None
+
+
+# 餐厅数量达到该值时 rank_restaurants 才改用 numpy 批量打分与排序，
+# 数量较少时构建数组的开销大于收益（约 100 家时持平）
+_BATCH_MIN_ROWS = 100
+
+# 餐厅数量达到该值时改用 numba 内核打分（单次循环、无中间数组），
+# 数量较少时编译与线程调度开销不划算
+_JIT_MIN_ROWS = 10000
+
+# Haversine 常量与热路径上的三角函数（模块级绑定，省去每次调用的属性查找）
+_EARTH_RADIUS_KM = 6371.0
+_TWO_R = 2 * _EARTH_RADIUS_KM
+_DEG2RAD = math.pi / 180.0
+_sin = math.sin
+_cos = math.cos
+_sqrt = math.sqrt
+_asin = math.asin
+_hypot = math.hypot
+
+# fast_distance 自动模式下使用等距圆柱近似的经纬度差上限（约 50km 内，城市尺度）
+_EQUIRECT_MAX_DELTA_DEG = 0.5
+
+
+_GEO_KERNELS_MODULE = "_geo_kernels"
+
+
+@lru_cache(maxsize=None)
+def _load_geo_kernels():
+    """
+    延迟加载 numba 编译内核（_geo_kernels），numba 不可用时返回 None
+
+    按本文件所在目录的路径加载，并固定注册为 "_geo_kernels"：
+    以包方式导入（scripts.centroid_calculator）或直接运行脚本时都能找到内核，
+    且 numba 磁盘缓存引用的模块名保持一致；numba 已安装却加载失败时给出警告
+    """
+    module = sys.modules.get(_GEO_KERNELS_MODULE)
+    if module is not None:
+        return module
+
+    spec = importlib.util.spec_from_file_location(
+        _GEO_KERNELS_MODULE,
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "_geo_kernels.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_GEO_KERNELS_MODULE] = module
+    try:
+        spec.loader.exec_module(module)
+    except (ImportError, OSError) as e:
+        del sys.modules[_GEO_KERNELS_MODULE]
+        if importlib.util.find_spec("numba") is not None:
+            warnings.warn(f"numba 已安装但无法加载 _geo_kernels，回退到纯 Python 实现: {e}")
+        return None
+    return module
 
 
 class CentroidCalculator:
     """地理中心点计算器"""
 
     @staticmethod
-    def calculate_centroid(coordinates: List[Tuple[float, float]]) -> Tuple[float, float]:
+    def calculate_centroid(coordinates) -> Tuple[float, float]:
         """
         计算多个点的地理中心点（重心）
 
         参数:
             coordinates: 坐标列表 [(lon1, lat1), (lon2, lat2), ...]
+                        或形状为 (N, 2) 的 numpy 数组
                         格式: (经度, 纬度)
 
         返回:
@@ -32,6 +104,15 @@ class CentroidCalculator:
             >>> lon, lat = CentroidCalculator.calculate_centroid(points)
             >>> print(f"中心点: ({lon:.6f}, {lat:.6f})")
         """
+        if np is not None and isinstance(coordinates, np.ndarray):
+            arr = np.asarray(coordinates, dtype=np.float64)
+            if arr.size == 0:
+                raise ValueError("坐标列表不能为空")
+            if arr.ndim != 2 or arr.shape[1] != 2:
+                raise ValueError(f"坐标格式错误: 应为 (经度, 纬度) 二元组，实际形状 {arr.shape}")
+            center_lon, center_lat = arr.mean(axis=0)
+            return (float(center_lon), float(center_lat))
+
         if not coordinates:
             raise ValueError("坐标列表不能为空")
 
@@ -62,30 +143,235 @@ class CentroidCalculator:
         注:
             这是直线距离，实际驾车距离约为这个距离的 1.2-1.4 倍
         """
-        R = 6371  # 地球半径（km）
+        lat1_rad = lat1 * _DEG2RAD
+        lat2_rad = lat2 * _DEG2RAD
+        delta_lat = (lat2 - lat1) * _DEG2RAD
+        delta_lon = (lon2 - lon1) * _DEG2RAD
 
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
+        a = _sin(delta_lat * 0.5) ** 2 + \
+            _cos(lat1_rad) * _cos(lat2_rad) * _sin(delta_lon * 0.5) ** 2
 
-        a = math.sin(delta_lat / 2) ** 2 + \
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
-        c = 2 * math.asin(math.sqrt(a))
+        return _TWO_R * _asin(_sqrt(a))
 
-        return R * c
+    @staticmethod
+    def equirectangular_distance(
+        lat1: float, lon1: float,
+        lat2: float, lon2: float
+    ) -> float:
+        """
+        计算两点间的直线距离（等距圆柱近似）
+
+        参数:
+            lat1, lon1: 第一个点的纬度、经度
+            lat2, lon2: 第二个点的纬度、经度
+
+        返回:
+            距离（单位：km）
+
+        注:
+            省去 Haversine 中的 sin/asin 运算，城市尺度（<50km）下
+            相对误差远小于 0.5%；跨城市或高纬度的长距离请使用 straight_line_distance
+        """
+        x = (lon2 - lon1) * _DEG2RAD * _cos((lat1 + lat2) * (0.5 * _DEG2RAD))
+        y = (lat2 - lat1) * _DEG2RAD
+        return _EARTH_RADIUS_KM * _hypot(x, y)
+
+    @staticmethod
+    def fast_distance(
+        lat1: float, lon1: float,
+        lat2: float, lon2: float,
+        mode: str = "auto"
+    ) -> float:
+        """
+        按精度需求选择直线距离算法
+
+        参数:
+            lat1, lon1: 第一个点的纬度、经度
+            lat2, lon2: 第二个点的纬度、经度
+            mode: "auto" (默认，两点经纬度差均小于0.5°时用等距圆柱近似，否则用Haversine)
+                  "haversine" 或 "equirectangular" 强制指定算法
+
+        返回:
+            距离（单位：km）
+        """
+        if mode == "auto":
+            if abs(lat2 - lat1) < _EQUIRECT_MAX_DELTA_DEG and \
+                    abs(lon2 - lon1) < _EQUIRECT_MAX_DELTA_DEG:
+                mode = "equirectangular"
+            else:
+                mode = "haversine"
+
+        if mode == "equirectangular":
+            return CentroidCalculator.equirectangular_distance(lat1, lon1, lat2, lon2)
+        if mode == "haversine":
+            return CentroidCalculator.straight_line_distance(lat1, lon1, lat2, lon2)
+        raise ValueError(f"未知的距离计算模式: {mode}")
+
+    @staticmethod
+    def equirectangular_distance_batch(lat1: float, lon1: float, lats, lons):
+        """
+        批量计算一个点到多个点的直线距离（等距圆柱近似，向量化）
+
+        参数:
+            lat1, lon1: 起点的纬度、经度（如中心点）
+            lats, lons: 目标点的纬度、经度序列
+
+        返回:
+            距离数组（单位：km），numpy 不可用时返回列表
+        """
+        if np is None:
+            return [
+                CentroidCalculator.equirectangular_distance(lat1, lon1, lat2, lon2)
+                for lat2, lon2 in zip(lats, lons)
+            ]
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+
+        x = (lons - lon1) * _DEG2RAD * np.cos((lats + lat1) * (0.5 * _DEG2RAD))
+        y = (lats - lat1) * _DEG2RAD
+        return _EARTH_RADIUS_KM * np.hypot(x, y)
+
+    @staticmethod
+    def straight_line_distance_batch(lat1: float, lon1: float, lats, lons):
+        """
+        批量计算一个点到多个点的直线距离（Haversine公式，向量化）
+
+        参数:
+            lat1, lon1: 起点的纬度、经度（如中心点）
+            lats, lons: 目标点的纬度、经度序列
+
+        返回:
+            距离数组（单位：km），numpy 不可用时返回列表
+
+        示例:
+            >>> dists = CentroidCalculator.straight_line_distance_batch(
+            ...     40.06, 116.37, [40.027183, 40.091268], [116.439192, 116.306005]
+            ... )
+        """
+        if np is None:
+            return [
+                CentroidCalculator.straight_line_distance(lat1, lon1, lat2, lon2)
+                for lat2, lon2 in zip(lats, lons)
+            ]
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+
+        delta_lat = (lats - lat1) * _DEG2RAD
+        delta_lon = (lons - lon1) * _DEG2RAD
+
+        a = np.sin(delta_lat * 0.5) ** 2 + \
+            _cos(lat1 * _DEG2RAD) * np.cos(lats * _DEG2RAD) * np.sin(delta_lon * 0.5) ** 2
+
+        return _TWO_R * np.arcsin(np.sqrt(a))
+
+    @staticmethod
+    def straight_line_distance_pairs(lats1, lons1, lats2, lons2):
+        """
+        逐对计算两组点之间的直线距离（Haversine公式）
+
+        适用于嵌套循环中大量调用的场景（如多个候选中心点 × 多个餐厅），
+        numba 可用时使用编译内核，否则回退到逐点的 math 实现
+
+        参数:
+            lats1, lons1: 第一组点的纬度、经度序列
+            lats2, lons2: 第二组点的纬度、经度序列（与第一组等长）
+
+        返回:
+            距离数组（单位：km），numba 不可用时返回列表
+        """
+        kernels = _load_geo_kernels()
+        if kernels is None:
+            return [
+                CentroidCalculator.straight_line_distance(lat1, lon1, lat2, lon2)
+                for lat1, lon1, lat2, lon2 in zip(lats1, lons1, lats2, lons2)
+            ]
+
+        lats1 = np.ascontiguousarray(lats1, dtype=np.float64)
+        lons1 = np.ascontiguousarray(lons1, dtype=np.float64)
+        lats2 = np.ascontiguousarray(lats2, dtype=np.float64)
+        lons2 = np.ascontiguousarray(lons2, dtype=np.float64)
+        if not (lats1.size == lons1.size == lats2.size == lons2.size):
+            raise ValueError("两组坐标的长度必须一致")
+
+        out = np.empty(lats1.size, dtype=np.float64)
+        kernels.haversine_pairs(lats1, lons1, lats2, lons2, out)
+        return out
+
+
+def _parse_location(location) -> Optional[Tuple[float, float]]:
+    """将高德 "lon,lat" 字符串或 (lon, lat) 序列解析为 (经度, 纬度)，缺失或无法解析时返回 None"""
+    try:
+        if isinstance(location, str):
+            lon, lat = location.split(",")
+        else:
+            lon, lat = location
+        return float(lon), float(lat)
+    except (TypeError, ValueError):
+        return None
+
+
+# 方差评估分档：阈值 (50, 100, 200) 划分出四个等级
+# 各档内容预先构建，evaluate_variance 返回其副本，调用方修改结果不会影响共享数据
+_VARIANCE_THRESHOLDS = (50, 100, 200)
+_VARIANCE_TIERS = (
+    {
+        "score": 5,
+        "level": "非常理想",
+        "icon": "⭐⭐⭐⭐⭐",
+        "advice": "时间相似度完美，强烈推荐！"
+    },
+    {
+        "score": 4,
+        "level": "良好",
+        "icon": "⭐⭐⭐⭐",
+        "advice": "时间相似度不错，可以接受"
+    },
+    {
+        "score": 3,
+        "level": "一般",
+        "icon": "⭐⭐⭐",
+        "advice": "时间差异有点大，但还可以"
+    },
+    {
+        "score": 2,
+        "level": "不理想",
+        "icon": "⭐⭐",
+        "advice": "时间差异太大，建议考虑其他地点或方案"
+    },
+)
+
+
+# 出行方式分档表：按距离档位 (≤3km, 3-10km, >10km) 给出
+# (骑行, 地铁/公交, 驾车) 的时间上限（分钟）与优先级，优先级 0 表示该档不考虑
+_TRANSPORT_MODES = ("bicycle", "transit", "driving")
+_TIER_DISTANCES_KM = (3, 10)
+_TIER_TIME_LIMITS = (
+    (30, 30, 20),
+    (0, 45, 40),
+    (0, 120, 60),
+)
+_TIER_PRIORITIES = (
+    (1, 2, 3),
+    (0, 2, 1),
+    (0, 2, 1),
+)
 
 
 class TravelTimeAnalyzer:
     """出行时间分析器"""
 
     @staticmethod
-    def calculate_variance(times: List[float]) -> Tuple[float, float, float]:
+    def calculate_variance(times) -> Tuple[float, float, float]:
         """
         计算出行时间的方差和统计信息
 
+        单次遍历（Welford 算法）同时得到均值、方差与最大/最小值，
+        numpy 数组输入直接使用向量化归约
+
         参数:
-            times: 时间列表（单位：分钟）
+            times: 时间列表或 numpy 数组（单位：分钟）
 
         返回:
             (平均时间, 方差, 最大差值)
@@ -96,17 +382,39 @@ class TravelTimeAnalyzer:
             >>> print(f"平均: {avg:.1f}分钟, 方差: {var:.1f}, 最大差: {max_diff:.1f}分钟")
             平均: 14.4分钟, 方差: 34.1, 最大差: 13.3分钟
         """
-        if not times:
+        if np is not None and isinstance(times, np.ndarray):
+            if times.size == 0:
+                raise ValueError("时间列表不能为空")
+            # 复用均值计算方差，避免 np.var 内部再求一次均值
+            avg_time = times.mean()
+            variance = ((times - avg_time) ** 2).mean()
+            return float(avg_time), float(variance), float(np.ptp(times))
+
+        n = 0
+        avg_time = 0.0
+        m2 = 0.0
+        min_time = math.inf
+        max_time = -math.inf
+        for t in times:
+            n += 1
+            delta = t - avg_time
+            avg_time += delta / n
+            m2 += delta * (t - avg_time)
+            if t < min_time:
+                min_time = t
+            if t > max_time:
+                max_time = t
+
+        if n == 0:
             raise ValueError("时间列表不能为空")
 
-        avg_time = sum(times) / len(times)
-        variance = sum((t - avg_time) ** 2 for t in times) / len(times)
-        max_diff = max(times) - min(times)
+        variance = m2 / n
+        max_diff = max_time - min_time
 
         return avg_time, variance, max_diff
 
     @staticmethod
-    def evaluate_variance(variance: float) -> Dict[str, any]:
+    def evaluate_variance(variance: float) -> Dict[str, Any]:
         """
         根据方差评估时间相似度
 
@@ -114,36 +422,9 @@ class TravelTimeAnalyzer:
             variance: 方差值
 
         返回:
-            包含评分、等级、建议的字典
+            包含评分、等级、建议的字典（新副本，可自由修改）
         """
-        if variance < 50:
-            return {
-                "score": 5,
-                "level": "非常理想",
-                "icon": "⭐⭐⭐⭐⭐",
-                "advice": "时间相似度完美，强烈推荐！"
-            }
-        elif variance < 100:
-            return {
-                "score": 4,
-                "level": "良好",
-                "icon": "⭐⭐⭐⭐",
-                "advice": "时间相似度不错，可以接受"
-            }
-        elif variance < 200:
-            return {
-                "score": 3,
-                "level": "一般",
-                "icon": "⭐⭐⭐",
-                "advice": "时间差异有点大，但还可以"
-            }
-        else:
-            return {
-                "score": 2,
-                "level": "不理想",
-                "icon": "⭐⭐",
-                "advice": "时间差异太大，建议考虑其他地点或方案"
-            }
+        return dict(_VARIANCE_TIERS[bisect_right(_VARIANCE_THRESHOLDS, variance)])
 
     @staticmethod
     def recommend_transport_mode(distance_km: float, driving_min: float, transit_min: float, bicycle_min: float = None) -> list:
@@ -186,6 +467,122 @@ class TravelTimeAnalyzer:
 
         return recommendations if recommendations else [("🚫 暂无", 999, 0)]
 
+    @staticmethod
+    def recommend_transport_modes_batch(distances_km, driving_mins, transit_mins, bicycle_mins=None):
+        """
+        批量判断多组 (餐厅, 出发地) 的可选出行方式（向量化，规则同 recommend_transport_mode）
+
+        参数:
+            distances_km: 距离序列（公里）
+            driving_mins: 驾车时间序列（分钟）
+            transit_mins: 公交/地铁时间序列（分钟）
+            bicycle_mins: 骑行时间序列（分钟，可选，缺失值用 None）
+
+        返回:
+            形状为 (N, 3) 的优先级矩阵，列顺序同 _TRANSPORT_MODES (骑行, 地铁/公交, 驾车)，
+            值为该方式的优先级（1最优），0 表示不推荐；numpy 不可用时为嵌套列表
+        """
+        if np is None:
+            if bicycle_mins is None:
+                bicycle_mins = [None] * len(distances_km)
+            priorities = []
+            for distance_km, driving_min, transit_min, bicycle_min in zip(
+                distances_km, driving_mins, transit_mins, bicycle_mins
+            ):
+                tier = next(
+                    (i for i, limit in enumerate(_TIER_DISTANCES_KM) if distance_km <= limit),
+                    len(_TIER_DISTANCES_KM)
+                )
+                times = (bicycle_min or math.inf, transit_min, driving_min)
+                priorities.append([
+                    priority if time < limit else 0
+                    for time, limit, priority in zip(
+                        times, _TIER_TIME_LIMITS[tier], _TIER_PRIORITIES[tier]
+                    )
+                ])
+            return priorities
+
+        distances_km = np.asarray(distances_km, dtype=np.float64)
+        if bicycle_mins is None:
+            bicycle_mins = np.full(distances_km.shape, np.nan)
+        times = np.column_stack((
+            np.asarray(bicycle_mins, dtype=np.float64),
+            np.asarray(transit_mins, dtype=np.float64),
+            np.asarray(driving_mins, dtype=np.float64),
+        ))
+
+        tier = np.searchsorted(_TIER_DISTANCES_KM, distances_km, side="left")
+        limits = np.asarray(_TIER_TIME_LIMITS, dtype=np.float64)[tier]
+        priorities = np.asarray(_TIER_PRIORITIES)[tier]
+
+        qualified = (times < limits) & (priorities > 0)
+        qualified[:, 0] &= times[:, 0] != 0  # 骑行时间缺失或为0时不推荐
+        return np.where(qualified, priorities, 0)
+
+
+# 距离评分斜率：参考距离内每公里扣分（默认参考距离 3km 时预先算好），超出后每公里扣分
+_NEAR_K = 0.3 / 3.0
+_FAR_K = 0.1
+
+
+def _numpy_scores(ratings, review_counts, distances_km, ref_reviews, ref_distance):
+    """餐厅综合分数的 numpy 表达式（与 calculate_restaurant_score 逐位一致）"""
+    # 标准化评分、评论数 (0-1)
+    rating_normalized = ratings / 5.0
+    if ref_reviews == 0:
+        review_normalized = np.full_like(review_counts, 0.5)
+    else:
+        review_normalized = review_counts / ref_reviews
+
+    # 标准化距离：3km 内线性递减，超过后快速衰减
+    near_k = _NEAR_K if ref_distance == 3.0 else 0.3 / ref_distance
+    distance_normalized = np.where(
+        distances_km <= ref_distance,
+        1 - distances_km * near_k,
+        np.maximum(0, 0.7 - (distances_km - ref_distance) * _FAR_K)
+    )
+
+    return (
+        rating_normalized * 0.7 +
+        review_normalized * 0.2 +
+        distance_normalized * 0.1
+    ) * 100
+
+
+def _jit_scores(kernels, ratings, review_counts, distances_km, ref_reviews, ref_distance):
+    """调用 numba 内核计算餐厅综合分数"""
+    scores = np.empty(ratings.size, dtype=np.float64)
+    kernels.score_restaurants(
+        ratings, review_counts, distances_km,
+        float(ref_reviews), float(ref_distance), scores
+    )
+    return scores
+
+
+@lru_cache(maxsize=None)
+def _jit_scoring_exact() -> bool:
+    """
+    numba 打分内核可用且与 numpy 表达式逐位一致时返回 True（首次调用时检查一次）
+
+    分数不一致会让同分餐厅的排序依赖于走哪条路径，因此不一致时不启用内核
+    """
+    kernels = _load_geo_kernels()
+    if kernels is None:
+        return False
+
+    # 覆盖距离分段的两侧、评论数为0，并包含向量化主体之外的尾部元素
+    n = 1027
+    ratings = np.tile(np.array([4.5, 4.8, 3.0, 0.0, 5.0]), n // 5 + 1)[:n]
+    review_counts = np.arange(n, dtype=np.float64) * 7.0
+    distances_km = np.linspace(0.0, 12.0, n)
+    for ref_reviews, ref_distance in ((5000, 3.0), (0, 2.0)):
+        expected = _numpy_scores(ratings, review_counts, distances_km, ref_reviews, ref_distance)
+        actual = _jit_scores(kernels, ratings, review_counts, distances_km, ref_reviews, ref_distance)
+        if not np.array_equal(expected, actual):
+            warnings.warn("numba 打分内核与 numpy 结果不一致，改用 numpy 实现")
+            return False
+    return True
+
 
 class RestaurantRanker:
     """餐厅排序器"""
@@ -253,10 +650,11 @@ class RestaurantRanker:
         # 标准化距离 (优先0-3km)
         if distance_km <= ref_distance:
             # 距离越近，分数越高
-            distance_normalized = 1 - (distance_km / ref_distance) * 0.3
+            near_k = _NEAR_K if ref_distance == 3.0 else 0.3 / ref_distance
+            distance_normalized = 1 - distance_km * near_k
         else:
             # 超过3km快速衰减
-            distance_normalized = max(0, 0.7 - (distance_km - ref_distance) * 0.1)
+            distance_normalized = max(0, 0.7 - (distance_km - ref_distance) * _FAR_K)
 
         # 综合分数
         score = (
@@ -267,10 +665,88 @@ class RestaurantRanker:
 
         return score
 
+    @staticmethod
+    def calculate_restaurant_scores_batch(
+        ratings,
+        review_counts,
+        distances_km,
+        ref_reviews: int = 5000,
+        ref_distance: float = 3.0
+    ):
+        """
+        批量计算餐厅的综合分数（向量化版本）
+
+        计算方式与 calculate_restaurant_score 完全一致
+
+        参数:
+            ratings: 餐厅评分序列 (0-5)
+            review_counts: 评论数量序列
+            distances_km: 距离中心地点序列 (km)
+            ref_reviews: 评论数参考值 (默认5000)
+            ref_distance: 距离参考值 (默认3km)
+
+        返回:
+            综合分数数组 (0-100)，numpy 不可用时返回列表
+        """
+        if np is None:
+            return [
+                RestaurantRanker.calculate_restaurant_score(
+                    rating, review_count, distance_km, ref_reviews, ref_distance
+                )
+                for rating, review_count, distance_km in zip(ratings, review_counts, distances_km)
+            ]
+
+        ratings = np.ascontiguousarray(ratings, dtype=np.float64)
+        review_counts = np.ascontiguousarray(review_counts, dtype=np.float64)
+        distances_km = np.ascontiguousarray(distances_km, dtype=np.float64)
+
+        if ratings.size >= _JIT_MIN_ROWS and _jit_scoring_exact():
+            return _jit_scores(
+                _load_geo_kernels(), ratings, review_counts, distances_km,
+                ref_reviews, ref_distance
+            )
+
+        return _numpy_scores(ratings, review_counts, distances_km, ref_reviews, ref_distance)
+
+    @staticmethod
+    def to_soa(restaurants: List[Dict], distances=None) -> Dict:
+        """
+        将餐厅列表转换为按列存储的结构（打分所需字段）
+
+        参数:
+            restaurants: 餐厅信息列表
+            distances: 各餐厅到中心点的距离 (可选)
+                未提供时读取餐厅的 distance_km 字段 (默认1km)
+
+        返回:
+            {"rating": ..., "review_count": ..., "distance_km": ...}
+            每列为与 restaurants 顺序一致的 numpy 数组（numpy 不可用时为列表）
+        """
+        if distances is None:
+            distances = (restaurant.get("distance_km", 1.0) for restaurant in restaurants)
+        ratings = (float(restaurant.get("rating", 0)) for restaurant in restaurants)
+        review_counts = (int(restaurant.get("review_count", 0)) for restaurant in restaurants)
+
+        if np is None:
+            return {
+                "rating": list(ratings),
+                "review_count": list(review_counts),
+                "distance_km": list(distances),
+            }
+
+        n = len(restaurants)
+        return {
+            "rating": np.fromiter(ratings, dtype=np.float64, count=n),
+            "review_count": np.fromiter(review_counts, dtype=np.float64, count=n),
+            "distance_km": np.fromiter(distances, dtype=np.float64, count=n),
+        }
+
     @staticmethod
     def rank_restaurants(
         restaurants: List[Dict],
-        distance_km_func=None
+        distance_km_func=None,
+        center: Optional[Tuple[float, float]] = None,
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         对餐厅进行排序
@@ -279,29 +755,115 @@ class RestaurantRanker:
             restaurants: 餐厅信息列表
                 每个元素应包含: id, name, rating, review_count, location
             distance_km_func: 计算距离的函数 (可选)
+            center: 中心点 (经度, 纬度)，可选
+                提供且未指定 distance_km_func 时，一次性批量计算
+                各餐厅 location ("lon,lat") 到中心点的直线距离；
+                location 缺失或无法解析的餐厅改用其 distance_km 字段 (默认1km)
+            top_k: 只返回分数最高的前 k 家 (可选)
+                指定时只做部分排序，不再对整个列表排序
 
         返回:
-            排序后的餐厅列表
+            排序后的餐厅列表（指定 top_k 时为新列表，否则原地排序）
         """
-        # 计算每个餐厅的综合分数
-        for restaurant in restaurants:
-            if distance_km_func:
-                distance = distance_km_func(restaurant.get("location"))
+        # 餐厅较少时（常见的 10-20 家），逐个打分比构建数组更快
+        vectorize = np is not None and len(restaurants) >= _BATCH_MIN_ROWS
+
+        # 计算到中心点的距离
+        distances = None
+        if center is not None and distance_km_func is None and restaurants:
+            locations = [
+                _parse_location(restaurant.get("location"))
+                for restaurant in restaurants
+            ]
+            if vectorize:
+                center_distances = CentroidCalculator.straight_line_distance_batch(
+                    center[1], center[0],
+                    [location[1] if location else math.nan for location in locations],
+                    [location[0] if location else math.nan for location in locations]
+                )
             else:
-                distance = restaurant.get("distance_km", 1.0)
+                center_distances = [
+                    CentroidCalculator.straight_line_distance(
+                        center[1], center[0], location[1], location[0]
+                    ) if location else math.nan
+                    for location in locations
+                ]
+            distances = [
+                float(distance) if location else restaurant.get("distance_km", 1.0)
+                for restaurant, location, distance in zip(restaurants, locations, center_distances)
+            ]
 
-            restaurant["score"] = RestaurantRanker.calculate_restaurant_score(
-                rating=float(restaurant.get("rating", 0)),
-                review_count=int(restaurant.get("review_count", 0)),
-                distance_km=distance
-            )
+        elif distance_km_func:
+            distances = [
+                distance_km_func(restaurant.get("location"))
+                for restaurant in restaurants
+            ]
 
-        # 按综合分数排序
-        restaurants.sort(key=lambda x: x["score"], reverse=True)
+        if not vectorize:
+            if distances is None:
+                distances = [restaurant.get("distance_km", 1.0) for restaurant in restaurants]
+
+            # 计算每个餐厅的综合分数
+            for restaurant, distance in zip(restaurants, distances):
+                restaurant["score"] = RestaurantRanker.calculate_restaurant_score(
+                    rating=float(restaurant.get("rating", 0)),
+                    review_count=int(restaurant.get("review_count", 0)),
+                    distance_km=distance
+                )
+
+            if top_k is not None and top_k < len(restaurants):
+                if top_k <= 0:
+                    return []
+                return heapq.nlargest(top_k, restaurants, key=lambda x: x["score"])
+
+            # 按综合分数排序
+            restaurants.sort(key=lambda x: x["score"], reverse=True)
+            return restaurants
+
+        # 一次性计算所有餐厅的综合分数（只读取打分所需的列）
+        columns = RestaurantRanker.to_soa(restaurants, distances)
+        scores = RestaurantRanker.calculate_restaurant_scores_batch(
+            ratings=columns["rating"],
+            review_counts=columns["review_count"],
+            distances_km=columns["distance_km"]
+        )
+        for restaurant, score in zip(restaurants, scores):
+            restaurant["score"] = float(score)
+
+        # 只取前 k 家：部分排序，同分保持原顺序
+        if top_k is not None and top_k < len(restaurants):
+            if top_k <= 0:
+                return []
+            # 第 k 高的分数作为门槛，门槛上的同分餐厅全部保留后再稳定排序
+            threshold = -np.partition(-scores, top_k - 1)[top_k - 1]
+            idx = np.flatnonzero(scores >= threshold)
+            idx = idx[np.argsort(-scores[idx], kind="stable")[:top_k]]
+            return [restaurants[i] for i in idx]
+
+        # 按综合分数排序（稳定排序，同分保持原顺序）
+        order = np.argsort(-scores, kind="stable")
+        restaurants[:] = [restaurants[i] for i in order]
 
         return restaurants
 
 
+# 每分钟的微秒数，出发时间按微秒精度取整
+_US_PER_MIN = 60 * 1000 * 1000
+
+
+class DepartureInfo(namedtuple(
+    "DepartureInfo",
+    "name travel_min buffer_min departure_time arrival_time"
+)):
+    """单人出发时间信息（元组存储，比逐人构造字典更省内存）"""
+
+    __slots__ = ()
+
+    def asdict(self) -> Dict:
+        """转换为字典，兼容按键名访问的调用方"""
+        return self._asdict()
+
+
 class DepartureTimeCalculator:
     """出发时间计算器"""
 
@@ -311,7 +873,7 @@ class DepartureTimeCalculator:
         participants: List[str],
         travel_times: List[float],
         buffer_min: float = 5.0
-    ) -> List[Dict]:
+    ) -> List[DepartureInfo]:
         """
         根据聚餐时间计算每人的出发时间
 
@@ -322,7 +884,8 @@ class DepartureTimeCalculator:
             buffer_min: 缓冲时间,如停车 (默认5分钟)
 
         返回:
-            出发时间列表
+            出发时间列表 [DepartureInfo, ...]
+            字段: name, travel_min, buffer_min, departure_time, arrival_time
 
         示例:
             >>> times = DepartureTimeCalculator.calculate_departure_times(
@@ -331,7 +894,7 @@ class DepartureTimeCalculator:
             ...     travel_times=[19, 6, 17]
             ... )
             >>> for t in times:
-            ...     print(f"{t['name']}: {t['departure_time']} 出发")
+            ...     print(f"{t.name}: {t.departure_time} 出发")
             张三: 14:10 出发
             李四: 14:19 出发
             王五: 14:08 出发
@@ -339,10 +902,14 @@ class DepartureTimeCalculator:
         # 解析聚餐时间
         try:
             hours, minutes = map(int, meeting_time.split(":"))
-            meeting = datetime.strptime(f"{hours:02d}:{minutes:02d}", "%H:%M")
         except ValueError:
             raise ValueError(f"时间格式错误: {meeting_time}，应为 HH:MM")
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError(f"时间格式错误: {meeting_time}，应为 HH:MM")
 
+        # 以当天分钟数计算，避免逐人构造 datetime/timedelta 与 strftime
+        meeting_minutes = hours * 60 + minutes
+        arrival_time = f"{hours:02d}:{minutes:02d}"
         departure_times = []
 
         for i, person in enumerate(participants):
@@ -352,43 +919,114 @@ class DepartureTimeCalculator:
             # 总耗时 = 出行时间 + 缓冲时间
             total_min = travel_times[i] + buffer_min
 
-            # 计算出发时间
-            departure = meeting - timedelta(minutes=total_min)
+            # 计算出发时间：先按微秒取整（与 timedelta 一致），
+            # 不足一分钟的部分舍去，跨零点时回绕到前一天
+            frac_min, whole_min = math.modf(total_min)
+            total_us = int(whole_min) * _US_PER_MIN + round(frac_min * _US_PER_MIN)
+            departure = (meeting_minutes * _US_PER_MIN - total_us) // _US_PER_MIN % (24 * 60)
 
-            departure_times.append({
-                "name": person,
-                "travel_min": travel_times[i],
-                "buffer_min": buffer_min,
-                "departure_time": departure.strftime("%H:%M"),
-                "arrival_time": meeting.strftime("%H:%M")
-            })
+            departure_times.append(DepartureInfo(
+                person,
+                travel_times[i],
+                buffer_min,
+                f"{departure // 60:02d}:{departure % 60:02d}",
+                arrival_time
+            ))
 
         return departure_times
 
 
+def _get_path(data, keys, cast=float, default=None):
+    """
+    按键/下标路径从嵌套的API响应中取值并转换类型
+
+    参数:
+        data: API响应字典
+        keys: 键/下标路径，如 ("route", "paths", 0, "duration")
+        cast: 对取到的值做的转换 (默认 float)
+        default: 路径缺失或转换失败时的返回值
+
+    返回:
+        转换后的值或 default
+    """
+    try:
+        for key in keys:
+            data = data[key]
+        return cast(data)
+    except (KeyError, TypeError, ValueError, IndexError):
+        return default
+
+
+def _seconds_to_minutes(seconds) -> float:
+    return int(seconds) / 60.0
+
+
+def _shortest_transit(transits: List[Dict]) -> Tuple[Optional[Dict], int]:
+    """单次遍历找出耗时最短的公交/地铁路线，返回 (路线, 耗时秒数)"""
+    shortest = None
+    shortest_duration = 0
+    for transit in transits:
+        duration_seconds = int(transit.get("duration", 0))
+        if shortest is None or duration_seconds < shortest_duration:
+            shortest = transit
+            shortest_duration = duration_seconds
+    return shortest, shortest_duration
+
+
+if msgspec is not None:
+    class _DrivingPath(msgspec.Struct):
+        """驾车路线方案（高德返回的数字字符串在解码时直接转为 int）"""
+        duration: Optional[int] = None
+
+    class _DrivingRoute(msgspec.Struct):
+        paths: List[_DrivingPath] = []
+
+    class _DrivingResponse(msgspec.Struct):
+        """maps_direction_driving 响应中出行时间相关的字段，其余字段解码时忽略"""
+        route: Optional[_DrivingRoute] = None
+
+
 class TravelTimeExtractor:
     """从高德API响应中提取出行时间"""
 
     @staticmethod
-    def extract_driving_time(api_response: Dict) -> Optional[float]:
+    def decode_driving_response(raw):
+        """
+        在接口边界一次性解码驾车路线API的原始JSON
+
+        参数:
+            raw: 高德 maps_direction_driving API 返回的 JSON 文本 (str 或 bytes)
+
+        返回:
+            msgspec 可用时为类型化的响应对象（duration 已是 int），
+            否则为 json.loads 得到的字典；两者均可直接传给 extract_driving_time
+            高德用 "" 或 [] 表示空字段，类型不符时同样回退为字典
+        """
+        if msgspec is not None:
+            try:
+                return msgspec.json.decode(raw, type=_DrivingResponse, strict=False)
+            except (msgspec.ValidationError, msgspec.DecodeError):
+                pass
+        return json.loads(raw)
+
+    @staticmethod
+    def extract_driving_time(api_response) -> Optional[float]:
         """
         从驾车路线API响应中提取时间（分钟）
 
         参数:
-            api_response: 高德 maps_direction_driving API 的响应字典
+            api_response: 高德 maps_direction_driving API 的响应字典，
+                或 decode_driving_response 解码得到的响应对象
 
         返回:
             出行时间（分钟）或None
         """
-        try:
-            if "route" in api_response and "paths" in api_response["route"]:
-                paths = api_response["route"]["paths"]
-                if paths and len(paths) > 0:
-                    duration_seconds = int(paths[0].get("duration", 0))
-                    return duration_seconds / 60.0
-        except (KeyError, TypeError, ValueError):
-            pass
-        return None
+        if msgspec is not None and isinstance(api_response, _DrivingResponse):
+            route = api_response.route
+            if route is None or not route.paths or route.paths[0].duration is None:
+                return None
+            return route.paths[0].duration / 60.0
+        return _get_path(api_response, ("route", "paths", 0, "duration"), _seconds_to_minutes)
 
     @staticmethod
     def extract_transit_time(api_response: Dict) -> Optional[float]:
@@ -406,12 +1044,8 @@ class TravelTimeExtractor:
                 transits = api_response["route"]["transits"]
                 if transits:
                     # 找到最短的路线
-                    min_duration = float('inf')
-                    for transit in transits:
-                        duration_seconds = int(transit.get("duration", 0))
-                        min_duration = min(min_duration, duration_seconds)
-                    if min_duration != float('inf'):
-                        return min_duration / 60.0
+                    _, min_duration = _shortest_transit(transits)
+                    return min_duration / 60.0
         except (KeyError, TypeError, ValueError):
             pass
         return None
@@ -444,9 +1078,9 @@ class TravelTimeExtractor:
                 return None
 
             # 选择最短路线
-            shortest_transit = min(transits, key=lambda t: int(t.get("duration", 0)))
+            shortest_transit, shortest_duration = _shortest_transit(transits)
 
-            total_duration = int(shortest_transit.get("duration", 0)) / 60.0
+            total_duration = shortest_duration / 60.0
             walking_time = 0
             transit_time = 0
             transfer_count = 0
@@ -529,15 +1163,8 @@ class TravelTimeExtractor:
         返回:
             出行时间（分钟）或None
         """
-        try:
-            if "route" in api_response:
-                route = api_response["route"]
-                duration_seconds = int(route.get("duration", 0))
-                if duration_seconds > 0:
-                    return duration_seconds / 60.0
-        except (KeyError, TypeError, ValueError):
-            pass
-        return None
+        duration_seconds = _get_path(api_response, ("route", "duration"), int, 0)
+        return duration_seconds / 60.0 if duration_seconds > 0 else None
 
     @staticmethod
     def extract_distance(api_response: Dict) -> Optional[float]:
@@ -551,16 +1178,12 @@ class TravelTimeExtractor:
         返回:
             距离（公里）或None
         """
-        try:
-            # 尝试从 route 中获取距离
-            if "route" in api_response:
-                route = api_response["route"]
-                distance_meters = int(route.get("distance", 0))
-                if distance_meters > 0:
-                    return distance_meters / 1000.0
-        except (KeyError, TypeError, ValueError):
-            pass
-        return None
+        distance_meters = _get_path(api_response, ("route", "distance"), int, 0)
+        return distance_meters / 1000.0 if distance_meters > 0 else None
+
+
+# 餐厅数据必需字段
+_REQUIRED_RESTAURANT_FIELDS = frozenset(("name", "rating", "review_count", "location"))
 
 
 class APIDataValidator:
@@ -583,6 +1206,34 @@ class APIDataValidator:
         """验证距离的合理性 (0 - 500km)"""
         return 0 < km < 500
 
+    @staticmethod
+    def validate_coordinates_batch(lons, lats):
+        """批量验证坐标的合理性，返回布尔数组（numpy 不可用时为列表）"""
+        if np is None:
+            return [
+                APIDataValidator.validate_coordinates(lon, lat)
+                for lon, lat in zip(lons, lats)
+            ]
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        return (lons >= -180) & (lons <= 180) & (lats >= -90) & (lats <= 90)
+
+    @staticmethod
+    def validate_travel_time_batch(minutes):
+        """批量验证出行时间的合理性 (0 - 600分钟)，None 视为无效"""
+        if np is None:
+            return [APIDataValidator.validate_travel_time(m) for m in minutes]
+        minutes = np.asarray(minutes, dtype=np.float64)
+        return (minutes > 0) & (minutes < 600)
+
+    @staticmethod
+    def validate_distance_batch(kms):
+        """批量验证距离的合理性 (0 - 500km)"""
+        if np is None:
+            return [APIDataValidator.validate_distance(km) for km in kms]
+        kms = np.asarray(kms, dtype=np.float64)
+        return (kms > 0) & (kms < 500)
+
     @staticmethod
     def validate_restaurant_data(restaurant: Dict) -> bool:
         """
@@ -590,20 +1241,23 @@ class APIDataValidator:
 
         要求: name, rating, review_count, location 字段存在
         """
-        required_fields = ["name", "rating", "review_count", "location"]
-        for field in required_fields:
-            if field not in restaurant or restaurant[field] is None:
+        if not _REQUIRED_RESTAURANT_FIELDS <= restaurant.keys():
+            return False
+        for field in _REQUIRED_RESTAURANT_FIELDS:
+            if restaurant[field] is None:
                 return False
 
         # 验证评分范围 (0-5)
         try:
-            rating = float(restaurant.get("rating", 0))
-            if rating < 0 or rating > 5:
-                return False
+            return 0 <= float(restaurant["rating"]) <= 5
         except (ValueError, TypeError):
             return False
 
-        return True
+    @staticmethod
+    def validate_restaurants(restaurants: List[Dict]) -> List[Dict]:
+        """批量验证餐厅数据，返回完整有效的餐厅列表"""
+        validate = APIDataValidator.validate_restaurant_data
+        return [restaurant for restaurant in restaurants if validate(restaurant)]
 
     @staticmethod
     def validate_transit_time(transit_time: Optional[float], distance_km: float) -> bool:
@@ -702,8 +1356,8 @@ if __name__ == "__main__":
         travel_times=[19, 6, 17]
     )
     for info in departure_times:
-        print(f"  {info['name']}: {info['departure_time']} 出发")
-        print(f"         ({info['travel_min']:.0f}分钟出行 + {info['buffer_min']:.0f}分钟缓冲)")
+        print(f"  {info.name}: {info.departure_time} 出发")
+        print(f"         ({info.travel_min:.0f}分钟出行 + {info.buffer_min:.0f}分钟缓冲)")
 
     # 示例 6: API响应数据提取
     print("\n[示例 6] 从高德API响应中提取数据")